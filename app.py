@@ -8,14 +8,32 @@ Team 220 - Georgia Tech MS Analytics
 
 import os
 import json
+import random
+import zlib
+import functools
+import threading
+from math import radians, sin, cos, asin, sqrt
 import numpy as np
-import pandas as pd
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
+
+# Optional: orjson serializes responses several times faster than stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ML imports
 import xgboost as xgb
-import shap
+
+# Optional: numba compiles the probability-simulation arithmetic to native code
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
 
 # Local imports
 from model.delay_duration.model import DelayDurationModel
@@ -35,12 +53,39 @@ from model.delay_duration.config import (
 # Initialize Flask app
 app = Flask(__name__)
 
+# Column order for the model's feature matrix
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+
+def ojsonify(obj):
+    """jsonify drop-in backed by orjson when installed.
+
+    orjson also serializes numpy scalars natively, so callers don't need
+    to wrap every value in float()/int().
+    """
+    if orjson is not None:
+        return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+                        mimetype='application/json')
+    return jsonify(obj)
+
 # =============================================================================
 # GLOBAL VARIABLES - Load model once at startup
 # =============================================================================
 model = None
 label_encoders = None
-shap_explainer = None
+
+# Guards load_model so __main__ and gunicorn workers can both call it safely
+_load_lock = threading.Lock()
+_model_loaded = False
+
+# Label encoders flattened to plain {class: int} dicts (filled in
+# load_model; empty until then so lookups just fall back to 0)
+ENC_AIRLINE = {}
+ENC_ORIGIN = {}
+ENC_DEST = {}
+
+# Prebuilt /api/model-info payload (built in load_model)
+MODEL_INFO_PAYLOAD = None
 
 # Airport data for distance calculations
 AIRPORTS = {
@@ -82,11 +127,127 @@ AIRLINES = {
     'F9': 'Frontier Airlines'
 }
 
+# Airport data flattened to parallel arrays (SoA layout) aligned with
+# AIRPORT_INDEX - one index lookup instead of two dict hops per read,
+# and the coordinate arrays feed the vectorized distance precompute
+AIRPORT_CODES = list(AIRPORTS)
+AIRPORT_INDEX = {code: i for i, code in enumerate(AIRPORT_CODES)}
+AIRPORT_LAT = np.array([AIRPORTS[code]['lat'] for code in AIRPORT_CODES], dtype=np.float32)
+AIRPORT_LON = np.array([AIRPORTS[code]['lon'] for code in AIRPORT_CODES], dtype=np.float32)
+
+# Known delay patterns, defined once instead of rebuilt on every request
+HUB_AIRPORTS = frozenset({'ATL', 'ORD', 'DFW', 'DEN', 'LAX', 'JFK', 'SFO', 'EWR', 'LGA', 'PHL'})
+PROBLEMATIC_AIRPORTS = frozenset({'EWR', 'LGA', 'JFK', 'SFO', 'ORD'})
+
+DAY_EFFECTS = {1: -0.02, 2: -0.03, 3: -0.02, 4: 0.01, 5: 0.06, 6: 0.03, 7: 0.05}
+AIRLINE_FACTORS = {
+    'AA': 0.02, 'DL': -0.05, 'UA': 0.03, 'WN': 0.01,
+    'B6': 0.04, 'AS': -0.04, 'NK': 0.12, 'F9': 0.10
+}
+TIME_EFFECTS = {1: -0.04, 2: -0.02, 3: 0.01, 4: 0.08, 5: 0.02}
+TIME_LABELS = {1: 'Early Morning', 2: 'Morning', 3: 'Afternoon', 4: 'Evening Rush', 5: 'Night'}
+
+DAY_NAMES = ['', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTH_NAMES = ['', 'January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+# Effect tables flattened to arrays indexed by day-of-week (1-7) and
+# month (1-12) so the jitted probability core avoids dict lookups
+_DAY_EFFECT_ARR = np.zeros(8)
+for _day, _effect in DAY_EFFECTS.items():
+    _DAY_EFFECT_ARR[_day] = _effect
+
+_MONTH_EFFECT_ARR = np.zeros(13)
+_MONTH_EFFECT_ARR[[6, 7, 8]] = 0.08   # Summer
+_MONTH_EFFECT_ARR[12] = 0.08          # December
+_MONTH_EFFECT_ARR[[9, 10]] = -0.04    # Fall
+
+# Display-side month effects for the simulated SHAP view (slightly
+# different weighting than the probability table above)
+_MONTH_SHAP_ARR = np.full(13, 0.01)
+_MONTH_SHAP_ARR[[6, 7, 8]] = 0.07     # Summer
+_MONTH_SHAP_ARR[12] = 0.08            # December
+_MONTH_SHAP_ARR[[9, 10]] = -0.04      # Fall
+
+_TIME_EFFECT_ARR = np.zeros(6)
+for _cat, _effect in TIME_EFFECTS.items():
+    _TIME_EFFECT_ARR[_cat] = _effect
+
+# The airport and airline lists never change - serialize them once at
+# import time instead of rebuilding and re-serializing on every request
+AIRPORTS_JSON = json.dumps([
+    {'code': code, 'city': data['city'], 'state': data['state'],
+     'lat': data['lat'], 'lon': data['lon']}
+    for code, data in AIRPORTS.items()
+])
+AIRLINES_JSON = json.dumps([{'code': k, 'name': v} for k, v in AIRLINES.items()])
+
+
+def _encoder_to_dict(encoder):
+    """Flatten a fitted LabelEncoder into a {class: code} dict."""
+    return dict(zip(encoder.classes_, range(len(encoder.classes_))))
+
+
+def build_distance_matrix():
+    """Precompute the airport-to-airport distance matrix.
+
+    Distances between the fixed set of airports never change, so compute
+    them all once with a vectorized Haversine over the flat coordinate
+    arrays instead of redoing the trigonometry on every prediction request.
+    """
+    lats = np.radians(AIRPORT_LAT)
+    lons = np.radians(AIRPORT_LON)
+
+    R = 3959  # Earth's radius in miles
+
+    # Vectorized Haversine over the full airport cross product
+    delta_lat = lats[:, None] - lats[None, :]
+    delta_lon = lons[:, None] - lons[None, :]
+    a = np.sin(delta_lat/2)**2 + np.cos(lats[:, None]) * np.cos(lats[None, :]) * np.sin(delta_lon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+    return (R * c).astype(np.float32)
+
+
+# Built at import so predictions work even before load_model runs
+DISTANCE_MATRIX = build_distance_matrix()
+
 
 def load_model():
-    """Load the trained model and encoders at startup."""
-    global model, label_encoders, shap_explainer
-    
+    """Load the trained model and encoders at startup.
+
+    Idempotent and thread-safe: repeat calls (dev server reloads, every
+    gunicorn worker's post_fork hook) return immediately once loaded.
+    """
+    global _model_loaded
+
+    with _load_lock:
+        if _model_loaded:
+            return
+        _load_model_locked()
+        _model_loaded = True
+
+    # Warm the first-call lazy init (booster setup, numpy caches) before
+    # real traffic arrives instead of on the first user request
+    _warm_up()
+
+
+def _warm_up():
+    """Run one throwaway prediction to absorb cold-start latency."""
+    try:
+        _predict_cached('ATL', 'ORD', 6, 15, 3, 14, 17, 'AA')
+        print("✓ Warm-up prediction complete")
+    except Exception as e:
+        print(f"⚠ Warm-up prediction failed: {e}")
+
+
+def _load_model_locked():
+    """Do the actual model/encoder loading. Caller holds _load_lock."""
+    global model, label_encoders, MODEL_INFO_PAYLOAD
+
+    # Cached predictions are stale once the model state changes
+    _predict_cached.cache_clear()
+
     model_path = Path(MODEL_FILE)
     encoders_path = Path(ENCODERS_FILE)
     
@@ -94,12 +255,18 @@ def load_model():
         # Load trained model
         model = DelayDurationModel()
         model.load(model_path)
-        print(f"✓ Model loaded from {model_path}")
-        
-        # Initialize SHAP explainer
-        if model.model is not None:
-            shap_explainer = shap.TreeExplainer(model.model)
-            print("✓ SHAP explainer initialized")
+        # One-time column-order check: the ndarray predict path skips
+        # feature-name validation, so a model trained with a different
+        # column order would otherwise predict silently wrong
+        if model.feature_names is not None and \
+                list(model.feature_names) != list(FEATURE_COLUMNS):
+            print(f"⚠ Model feature order does not match FEATURE_COLUMNS:")
+            print(f"  model:    {list(model.feature_names)}")
+            print(f"  expected: {list(FEATURE_COLUMNS)}")
+            print("  Refusing to serve this model - falling back to simulation")
+            model = None
+        else:
+            print(f"✓ Model loaded from {model_path}")
     else:
         print(f"⚠ Model file not found at {model_path}")
         print("  Run 'python -m model.delay_duration.main' to train the model")
@@ -108,24 +275,35 @@ def load_model():
     if encoders_path.exists():
         label_encoders = DelayDurationModel.load_encoders(encoders_path)
         print(f"✓ Encoders loaded from {encoders_path}")
+
+        # Flatten each encoder to a plain dict - label encoding is just an
+        # int map, so skip the sklearn/numpy machinery on the request path
+        global ENC_AIRLINE, ENC_ORIGIN, ENC_DEST
+        ENC_AIRLINE = _encoder_to_dict(label_encoders['Reporting_Airline'])
+        ENC_ORIGIN = _encoder_to_dict(label_encoders['Origin'])
+        ENC_DEST = _encoder_to_dict(label_encoders['Dest'])
     else:
         print(f"⚠ Encoders file not found at {encoders_path}")
         label_encoders = None
 
+    # Read metrics from disk once and serve the prebuilt payload
+    MODEL_INFO_PAYLOAD = _build_model_info()
+
 
 def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points using Haversine formula."""
+    """Calculate distance between two points using Haversine formula.
+
+    Uses the stdlib math module: for scalar inputs it avoids the numpy
+    ufunc dispatch overhead, which dwarfs the actual arithmetic here.
+    """
     R = 3959  # Earth's radius in miles
-    
-    lat1_rad = np.radians(lat1)
-    lat2_rad = np.radians(lat2)
-    delta_lat = np.radians(lat2 - lat1)
-    delta_lon = np.radians(lon2 - lon1)
-    
-    a = np.sin(delta_lat/2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon/2)**2
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-    
-    return R * c
+
+    delta_lat = radians(lat2 - lat1)
+    delta_lon = radians(lon2 - lon1)
+
+    a = sin(delta_lat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(delta_lon/2)**2
+
+    return 2 * R * asin(sqrt(a))
 
 
 def prepare_features(data):
@@ -140,14 +318,9 @@ def prepare_features(data):
     arr_hour = int(data.get('arrHour', 17))
     airline = data.get('airline', 'AA')
     
-    # Calculate distance
-    if origin in AIRPORTS and dest in AIRPORTS:
-        origin_data = AIRPORTS[origin]
-        dest_data = AIRPORTS[dest]
-        distance = calculate_distance(
-            origin_data['lat'], origin_data['lon'],
-            dest_data['lat'], dest_data['lon']
-        )
+    # Look up precomputed distance (O(1) instead of per-request trig)
+    if origin in AIRPORT_INDEX and dest in AIRPORT_INDEX:
+        distance = float(DISTANCE_MATRIX[AIRPORT_INDEX[origin], AIRPORT_INDEX[dest]])
     else:
         distance = 1000  # Default distance
     
@@ -176,27 +349,11 @@ def prepare_features(data):
         'dep_time_category': time_category
     }
     
-    # Encode categorical features if encoders are available
-    if label_encoders:
-        try:
-            features['Reporting_Airline_encoded'] = label_encoders['Reporting_Airline'].transform([airline])[0]
-        except (KeyError, ValueError):
-            features['Reporting_Airline_encoded'] = 0
-            
-        try:
-            features['Origin_encoded'] = label_encoders['Origin'].transform([origin])[0]
-        except (KeyError, ValueError):
-            features['Origin_encoded'] = 0
-            
-        try:
-            features['Dest_encoded'] = label_encoders['Dest'].transform([dest])[0]
-        except (KeyError, ValueError):
-            features['Dest_encoded'] = 0
-    else:
-        # Default encoding
-        features['Reporting_Airline_encoded'] = 0
-        features['Origin_encoded'] = 0
-        features['Dest_encoded'] = 0
+    # Encode categorical features - unknown values (and the empty dicts
+    # before encoders load) default to 0, no branching or exceptions
+    features['Reporting_Airline_encoded'] = ENC_AIRLINE.get(airline, 0)
+    features['Origin_encoded'] = ENC_ORIGIN.get(origin, 0)
+    features['Dest_encoded'] = ENC_DEST.get(dest, 0)
     
     return features, {
         'origin': origin,
@@ -210,100 +367,158 @@ def prepare_features(data):
     }
 
 
-def simulate_probability(raw_data):
-    """
-    Simulate delay probability based on known patterns.
-    Used when probability model is not available.
+@njit(cache=True, fastmath=True)
+def _simulate_probability_core(dep_hour, day_of_week, month, distance,
+                               origin_hub, dest_hub, origin_problem,
+                               dest_problem, airline_effect, noise):
+    """Scalar arithmetic core of the probability simulation.
+
+    Pure numeric code over plain scalars so numba can compile it; the
+    string/set lookups stay in the Python wrapper.
     """
     base_prob = 0.22
-    
+
     # Time effects
-    dep_hour = raw_data['dep_hour']
     if 16 <= dep_hour <= 20:
         base_prob += 0.12  # Evening rush
     elif 6 <= dep_hour <= 9:
         base_prob += 0.04  # Morning rush
     elif dep_hour < 6:
         base_prob -= 0.06  # Red-eye flights
-    
+
     # Day of week effects
-    day_effects = {1: -0.02, 2: -0.03, 3: -0.02, 4: 0.01, 5: 0.06, 6: 0.03, 7: 0.05}
-    base_prob += day_effects.get(raw_data['day_of_week'], 0)
-    
-    # Month effects
-    month = raw_data['month']
-    if month in [6, 7, 8]:
-        base_prob += 0.08  # Summer
-    elif month == 12:
-        base_prob += 0.08  # December
-    elif month in [9, 10]:
-        base_prob -= 0.04  # Fall
-    
+    if 1 <= day_of_week <= 7:
+        base_prob += _DAY_EFFECT_ARR[day_of_week]
+
+    # Month effects (summer/December surcharge, fall discount)
+    if 1 <= month <= 12:
+        base_prob += _MONTH_EFFECT_ARR[month]
+
     # Distance effects
-    distance = raw_data['distance']
     if distance > 2000:
         base_prob += 0.06
     elif distance > 1000:
         base_prob += 0.03
     elif distance < 500:
         base_prob -= 0.02
-    
+
     # Hub airport effects
-    hub_airports = ['ATL', 'ORD', 'DFW', 'DEN', 'LAX', 'JFK', 'SFO', 'EWR', 'LGA', 'PHL']
-    problematic = ['EWR', 'LGA', 'JFK', 'SFO', 'ORD']
-    
-    if raw_data['origin'] in hub_airports:
+    if origin_hub:
         base_prob += 0.05
-    if raw_data['dest'] in hub_airports:
+    if dest_hub:
         base_prob += 0.04
-    if raw_data['origin'] in problematic:
+    if origin_problem:
         base_prob += 0.06
-    if raw_data['dest'] in problematic:
+    if dest_problem:
         base_prob += 0.05
-    
-    # Airline effects
-    airline_factors = {
-        'AA': 0.02, 'DL': -0.05, 'UA': 0.03, 'WN': 0.01,
-        'B6': 0.04, 'AS': -0.04, 'NK': 0.12, 'F9': 0.10
-    }
-    base_prob += airline_factors.get(raw_data['airline'], 0)
-    
-    # Add some randomness
-    base_prob += np.random.uniform(-0.04, 0.04)
-    
-    return np.clip(base_prob, 0.05, 0.85)
 
+    # Airline effects plus randomness
+    base_prob += airline_effect + noise
 
-def generate_shap_values(features_df, raw_data, probability):
-    """Generate SHAP values for the prediction."""
-    global shap_explainer
-    
+    return max(0.05, min(0.85, base_prob))
+
+
+def simulate_probability(raw_data, noise=None):
+    """
+    Simulate delay probability based on known patterns.
+    Used when probability model is not available.
+
+    Args:
+        noise: Jitter in [-0.04, 0.04]; pass a value derived from the
+               input (see _input_noise) for deterministic, cacheable
+               output. Drawn randomly if None.
+    """
+    if noise is None:
+        noise = random.uniform(-0.04, 0.04)
+
+    return float(_simulate_probability_core(
+        raw_data['dep_hour'],
+        raw_data['day_of_week'],
+        raw_data['month'],
+        float(raw_data['distance']),
+        raw_data['origin'] in HUB_AIRPORTS,
+        raw_data['dest'] in HUB_AIRPORTS,
+        raw_data['origin'] in PROBLEMATIC_AIRPORTS,
+        raw_data['dest'] in PROBLEMATIC_AIRPORTS,
+        AIRLINE_FACTORS.get(raw_data['airline'], 0.0),
+        noise
+    ))
+
+
+def _noise_key(*parts):
+    """Stable 32-bit key over the prediction inputs.
+
+    The built-in hash() is salted per process (PYTHONHASHSEED), so
+    under multiple gunicorn workers the same request would get
+    different noise depending on which worker served it.
+    """
+    return zlib.crc32(repr(parts).encode())
+
+
+def _input_noise(key_hash):
+    """Derive deterministic noise values from a hashed input tuple.
+
+    Returns (probability_noise, duration_noise): the low 16 bits give
+    jitter in [-0.04, 0.04] and the next 16 bits a value in [0, 20),
+    matching the spread of the random draws they replace.
+    """
+    prob_noise = ((key_hash & 0xFFFF) / 0xFFFF - 0.5) * 0.08
+    duration_noise = ((key_hash >> 16) & 0xFFFF) / 0xFFFF * 20
+    return prob_noise, duration_noise
+
+
+def generate_shap_values(features_row, raw_data, probability):
+    """Generate SHAP values for the prediction.
+
+    Args:
+        features_row: (1, n_features) ndarray in FEATURE_COLUMNS order
+    """
     shap_values_list = []
-    
-    if shap_explainer is not None and model is not None:
-        # Use real SHAP explainer
+
+    if model is not None and model.is_fitted:
+        # XGBoost computes exact TreeSHAP values natively (pred_contribs);
+        # the last column of the result is the bias term
         try:
-            shap_values = shap_explainer.shap_values(features_df)
-            feature_names = FEATURE_COLUMNS
-            
-            for i, name in enumerate(feature_names):
-                shap_values_list.append({
-                    'feature': name,
-                    'displayName': format_feature_name(name),
-                    'value': str(features_df.iloc[0][name]),
-                    'shap': float(shap_values[0][i])
-                })
+            dmatrix = xgb.DMatrix(features_row, feature_names=FEATURE_COLUMNS)
+            contribs = model.booster.predict(dmatrix, pred_contribs=True)
+            shap_values_list = _shap_row(features_row[0], contribs[0])
         except Exception as e:
             print(f"SHAP error: {e}")
             shap_values_list = generate_simulated_shap(raw_data, probability)
     else:
         # Generate simulated SHAP values
         shap_values_list = generate_simulated_shap(raw_data, probability)
-    
-    # Sort by absolute SHAP value
+
+    return _top_shap(shap_values_list)
+
+
+def _shap_row(feature_values, contribs_row):
+    """Build the per-feature SHAP payload for one prediction row."""
+    return [
+        {
+            'feature': name,
+            'displayName': format_feature_name(name),
+            'value': str(feature_values[i]),
+            'shap': float(contribs_row[i])
+        }
+        for i, name in enumerate(FEATURE_COLUMNS)
+    ]
+
+
+def _top_shap(shap_values_list, top_n=8):
+    """Sort by absolute SHAP value and keep the strongest features."""
     shap_values_list.sort(key=lambda x: abs(x['shap']), reverse=True)
-    
-    return shap_values_list[:8]  # Top 8 features
+    return shap_values_list[:top_n]
+
+
+def _risk_level(probability):
+    """Map a delay probability to a (level, text) pair."""
+    if probability >= 0.5:
+        return 'high', 'High risk of significant delay'
+    elif probability >= 0.3:
+        return 'medium', 'Moderate risk of delay'
+    else:
+        return 'low', 'Low risk of delay'
 
 
 def generate_simulated_shap(raw_data, probability):
@@ -328,33 +543,21 @@ def generate_simulated_shap(raw_data, probability):
     })
     
     # Day of week
-    days = ['', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     day = raw_data['day_of_week']
-    day_effects = {1: -0.02, 2: -0.03, 3: -0.02, 4: 0.01, 5: 0.06, 6: 0.03, 7: 0.05}
     features.append({
         'feature': 'DayOfWeek',
         'displayName': 'Day of Week',
-        'value': days[day] if day < len(days) else str(day),
-        'shap': day_effects.get(day, 0)
+        'value': DAY_NAMES[day] if day < len(DAY_NAMES) else str(day),
+        'shap': float(_DAY_EFFECT_ARR[day]) if 1 <= day <= 7 else 0
     })
-    
+
     # Month
-    months = ['', 'January', 'February', 'March', 'April', 'May', 'June',
-              'July', 'August', 'September', 'October', 'November', 'December']
     month = raw_data['month']
-    if month in [6, 7, 8]:
-        month_effect = 0.07
-    elif month == 12:
-        month_effect = 0.08
-    elif month in [9, 10]:
-        month_effect = -0.04
-    else:
-        month_effect = 0.01
     features.append({
         'feature': 'Month',
         'displayName': 'Month',
-        'value': months[month] if month < len(months) else str(month),
-        'shap': month_effect
+        'value': MONTH_NAMES[month] if month < len(MONTH_NAMES) else str(month),
+        'shap': float(_MONTH_SHAP_ARR[month]) if 1 <= month <= 12 else 0.01
     })
     
     # Distance
@@ -374,45 +577,38 @@ def generate_simulated_shap(raw_data, probability):
     
     # Origin airport
     origin = raw_data['origin']
-    hub_airports = ['ATL', 'ORD', 'DFW', 'DEN', 'LAX', 'JFK', 'SFO', 'EWR', 'LGA', 'PHL']
     features.append({
         'feature': 'Origin_encoded',
         'displayName': 'Origin Airport',
         'value': origin,
-        'shap': 0.06 if origin in hub_airports else -0.02
+        'shap': 0.06 if origin in HUB_AIRPORTS else -0.02
     })
-    
+
     # Destination
     dest = raw_data['dest']
     features.append({
         'feature': 'Dest_encoded',
         'displayName': 'Destination',
         'value': dest,
-        'shap': 0.05 if dest in hub_airports else -0.02
+        'shap': 0.05 if dest in HUB_AIRPORTS else -0.02
     })
-    
+
     # Airline
     airline = raw_data['airline']
-    airline_effects = {
-        'AA': 0.02, 'DL': -0.05, 'UA': 0.03, 'WN': 0.01,
-        'B6': 0.04, 'AS': -0.04, 'NK': 0.12, 'F9': 0.10
-    }
     features.append({
         'feature': 'Reporting_Airline_encoded',
         'displayName': 'Airline',
         'value': AIRLINES.get(airline, airline),
-        'shap': airline_effects.get(airline, 0)
+        'shap': AIRLINE_FACTORS.get(airline, 0)
     })
-    
+
     # Time category
-    time_labels = {1: 'Early Morning', 2: 'Morning', 3: 'Afternoon', 4: 'Evening Rush', 5: 'Night'}
     time_cat = raw_data['time_category']
-    time_effects = {1: -0.04, 2: -0.02, 3: 0.01, 4: 0.08, 5: 0.02}
     features.append({
         'feature': 'dep_time_category',
         'displayName': 'Time of Day',
-        'value': time_labels.get(time_cat, str(time_cat)),
-        'shap': time_effects.get(time_cat, 0)
+        'value': TIME_LABELS.get(time_cat, str(time_cat)),
+        'shap': float(_TIME_EFFECT_ARR[time_cat]) if 1 <= time_cat <= 5 else 0
     })
     
     return features
@@ -453,23 +649,13 @@ def index():
 @app.route('/api/airports')
 def get_airports():
     """Return list of airports."""
-    airport_list = []
-    for code, data in AIRPORTS.items():
-        airport_list.append({
-            'code': code,
-            'city': data['city'],
-            'state': data['state'],
-            'lat': data['lat'],
-            'lon': data['lon']
-        })
-    return jsonify(airport_list)
+    return Response(AIRPORTS_JSON, mimetype='application/json')
 
 
 @app.route('/api/airlines')
 def get_airlines():
     """Return list of airlines."""
-    airline_list = [{'code': k, 'name': v} for k, v in AIRLINES.items()]
-    return jsonify(airline_list)
+    return Response(AIRLINES_JSON, mimetype='application/json')
 
 
 @app.route('/api/predict', methods=['POST'])
@@ -477,45 +663,237 @@ def predict():
     """Make delay prediction."""
     try:
         data = request.get_json()
-        
+
         if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Prepare features
-        features, raw_data = prepare_features(data)
-        
-        # Create DataFrame for model
-        features_df = pd.DataFrame([features])[FEATURE_COLUMNS]
-        
-        # Get predictions
-        if model is not None and model.is_fitted:
-            # Use real model for duration prediction
-            duration_prediction = model.predict(features_df)[0]
-            # Simulate probability (or use separate probability model if available)
-            probability = simulate_probability(raw_data)
+            return ojsonify({'error': 'No data provided'}), 400
+
+        result = _predict_cached(
+            data.get('origin'),
+            data.get('destination'),
+            int(data.get('month', 6)),
+            int(data.get('day', 15)),
+            int(data.get('dayOfWeek', 3)),
+            int(data.get('depHour', 14)),
+            int(data.get('arrHour', 17)),
+            data.get('airline', 'AA')
+        )
+        return ojsonify(result)
+
+    except Exception as e:
+        print(f"Prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        return ojsonify({'error': str(e)}), 500
+
+
+@functools.lru_cache(maxsize=4096)
+def _predict_cached(origin, dest, month, day, day_of_week, dep_hour, arr_hour, airline):
+    """Run the full prediction pipeline for one canonicalized input.
+
+    Identical inputs produce identical responses, so the whole payload is
+    memoized on the 8 input fields - repeat requests skip the model, SHAP
+    and simulation entirely. The simulated noise is seeded from the input
+    tuple to keep the cache sound.
+    """
+    data = {
+        'origin': origin,
+        'destination': dest,
+        'month': month,
+        'day': day,
+        'dayOfWeek': day_of_week,
+        'depHour': dep_hour,
+        'arrHour': arr_hour,
+        'airline': airline
+    }
+
+    # Prepare features
+    features, raw_data = prepare_features(data)
+
+    # Build feature row directly as a float32 array - avoids the
+    # per-request pandas DataFrame construction overhead
+    features_row = np.empty((1, len(FEATURE_COLUMNS)), dtype=np.float32)
+    for name, i in FEATURE_INDEX.items():
+        features_row[0, i] = features[name]
+
+    # Deterministic per-input noise so cached responses stay valid
+    prob_noise, duration_noise = _input_noise(
+        _noise_key(origin, dest, month, day, day_of_week, dep_hour, arr_hour, airline)
+    )
+
+    # Get predictions
+    if model is not None and model.is_fitted:
+        # Use real model for duration prediction
+        duration_prediction = float(model.predict_row(features_row)[0])
+        # Simulate probability (or use separate probability model if available)
+        probability = simulate_probability(raw_data, noise=prob_noise)
+    else:
+        # Simulate both
+        probability = simulate_probability(raw_data, noise=prob_noise)
+        if probability > 0.25:
+            duration_prediction = 15 + (probability * 60) + duration_noise
+        else:
+            duration_prediction = 0
+
+    # Generate SHAP values
+    shap_values = generate_shap_values(features_row, raw_data, probability)
+
+    # Determine risk level
+    risk_level, risk_text = _risk_level(probability)
+
+    return {
+        'success': True,
+        'probability': round(probability, 4),
+        'probabilityPercent': round(probability * 100, 1),
+        'expectedDelay': round(max(0, duration_prediction), 1),
+        'riskLevel': risk_level,
+        'riskText': risk_text,
+        'shapValues': shap_values,
+        'modelUsed': model is not None and model.is_fitted,
+        'input': {
+            'origin': raw_data['origin'],
+            'destination': raw_data['dest'],
+            'airline': raw_data['airline'],
+            'distance': round(raw_data['distance'], 1)
+        }
+    }
+
+
+@app.route('/api/predict_batch', methods=['POST'])
+def predict_batch():
+    """Make delay predictions for a JSON array of flights in one model call."""
+    try:
+        data = request.get_json()
+
+        if not isinstance(data, list) or not data:
+            return ojsonify({'error': 'Expected a non-empty JSON array'}), 400
+
+        return ojsonify(_predict_batch(data))
+
+    except Exception as e:
+        print(f"Batch prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        return ojsonify({'error': str(e)}), 500
+
+
+def _predict_batch(items):
+    """Vectorized prediction over a list of request dicts.
+
+    Builds one (B, n_features) float32 matrix and runs a single model
+    call plus a single TreeSHAP call for the whole batch, instead of
+    paying per-request overhead B times.
+    """
+    n = len(items)
+
+    origins = [item.get('origin') for item in items]
+    dests = [item.get('destination') for item in items]
+    airlines = [item.get('airline', 'AA') for item in items]
+
+    months = np.fromiter((int(item.get('month', 6)) for item in items),
+                         dtype=np.int64, count=n)
+    days = np.fromiter((int(item.get('day', 15)) for item in items),
+                       dtype=np.int64, count=n)
+    days_of_week = np.fromiter((int(item.get('dayOfWeek', 3)) for item in items),
+                               dtype=np.int64, count=n)
+    dep_hours = np.fromiter((int(item.get('depHour', 14)) for item in items),
+                            dtype=np.int64, count=n)
+    arr_hours = np.fromiter((int(item.get('arrHour', 17)) for item in items),
+                            dtype=np.int64, count=n)
+
+    # Distances in one fancy-index into the precomputed matrix
+    orig_idx = np.fromiter((AIRPORT_INDEX.get(o, -1) for o in origins),
+                           dtype=np.int64, count=n)
+    dest_idx = np.fromiter((AIRPORT_INDEX.get(d, -1) for d in dests),
+                           dtype=np.int64, count=n)
+    known = (orig_idx >= 0) & (dest_idx >= 0)
+    distances = np.where(known, DISTANCE_MATRIX[orig_idx, dest_idx],
+                         np.float32(1000.0))
+
+    # Elapsed time and time-of-day category, vectorized
+    elapsed = (arr_hours - dep_hours) * 60
+    elapsed = np.where(elapsed < 0, elapsed + 24 * 60, elapsed)
+    elapsed = np.maximum(elapsed, 60)
+
+    time_categories = np.select(
+        [(dep_hours >= 5) & (dep_hours < 9),
+         (dep_hours >= 9) & (dep_hours < 12),
+         (dep_hours >= 12) & (dep_hours < 17),
+         (dep_hours >= 17) & (dep_hours < 21)],
+        [1, 2, 3, 4],
+        default=5
+    )
+
+    # Categorical encodings via the flattened dicts (unknowns map to 0)
+    airline_enc = np.fromiter((ENC_AIRLINE.get(a, 0) for a in airlines),
+                              dtype=np.int64, count=n)
+    origin_enc = np.fromiter((ENC_ORIGIN.get(o, 0) for o in origins),
+                             dtype=np.int64, count=n)
+    dest_enc = np.fromiter((ENC_DEST.get(d, 0) for d in dests),
+                           dtype=np.int64, count=n)
+
+    # Assemble the feature matrix in FEATURE_COLUMNS order
+    X = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float32)
+    X[:, FEATURE_INDEX['Month']] = months
+    X[:, FEATURE_INDEX['Quarter']] = (months - 1) // 3 + 1
+    X[:, FEATURE_INDEX['DayofMonth']] = days
+    X[:, FEATURE_INDEX['DayOfWeek']] = days_of_week
+    X[:, FEATURE_INDEX['Reporting_Airline_encoded']] = airline_enc
+    X[:, FEATURE_INDEX['Origin_encoded']] = origin_enc
+    X[:, FEATURE_INDEX['Dest_encoded']] = dest_enc
+    X[:, FEATURE_INDEX['Distance']] = distances
+    X[:, FEATURE_INDEX['CRSElapsedTime']] = elapsed
+    X[:, FEATURE_INDEX['dep_hour']] = dep_hours
+    X[:, FEATURE_INDEX['arr_hour']] = arr_hours
+    X[:, FEATURE_INDEX['dep_time_category']] = time_categories
+
+    model_used = model is not None and model.is_fitted
+
+    durations = None
+    contribs = None
+    if model_used:
+        durations = model.predict_row(X)
+        try:
+            dmatrix = xgb.DMatrix(X, feature_names=FEATURE_COLUMNS)
+            contribs = model.booster.predict(dmatrix, pred_contribs=True)
+        except Exception as e:
+            print(f"Batch SHAP error: {e}")
+
+    results = []
+    for i in range(n):
+        raw_data = {
+            'origin': origins[i],
+            'dest': dests[i],
+            'airline': airlines[i],
+            'distance': float(distances[i]),
+            'dep_hour': int(dep_hours[i]),
+            'day_of_week': int(days_of_week[i]),
+            'month': int(months[i]),
+            'time_category': int(time_categories[i])
+        }
+
+        # Same deterministic per-input noise as the single-prediction path
+        prob_noise, duration_noise = _input_noise(
+            _noise_key(origins[i], dests[i], int(months[i]), int(days[i]),
+                       int(days_of_week[i]), int(dep_hours[i]), int(arr_hours[i]),
+                       airlines[i])
+        )
+        probability = simulate_probability(raw_data, noise=prob_noise)
+
+        if model_used:
+            duration_prediction = float(durations[i])
+        elif probability > 0.25:
+            duration_prediction = 15 + (probability * 60) + duration_noise
         else:
-            # Simulate both
-            probability = simulate_probability(raw_data)
-            if probability > 0.25:
-                duration_prediction = 15 + (probability * 60) + np.random.uniform(0, 20)
-            else:
-                duration_prediction = 0
-        
-        # Generate SHAP values
-        shap_values = generate_shap_values(features_df, raw_data, probability)
-        
-        # Determine risk level
-        if probability >= 0.5:
-            risk_level = 'high'
-            risk_text = 'High risk of significant delay'
-        elif probability >= 0.3:
-            risk_level = 'medium'
-            risk_text = 'Moderate risk of delay'
+            duration_prediction = 0
+
+        if contribs is not None:
+            shap_values = _top_shap(_shap_row(X[i], contribs[i]))
         else:
-            risk_level = 'low'
-            risk_text = 'Low risk of delay'
-        
-        return jsonify({
+            shap_values = _top_shap(generate_simulated_shap(raw_data, probability))
+
+        risk_level, risk_text = _risk_level(probability)
+
+        results.append({
             'success': True,
             'probability': round(probability, 4),
             'probabilityPercent': round(probability * 100, 1),
@@ -523,7 +901,7 @@ def predict():
             'riskLevel': risk_level,
             'riskText': risk_text,
             'shapValues': shap_values,
-            'modelUsed': model is not None and model.is_fitted,
+            'modelUsed': model_used,
             'input': {
                 'origin': raw_data['origin'],
                 'destination': raw_data['dest'],
@@ -531,25 +909,20 @@ def predict():
                 'distance': round(raw_data['distance'], 1)
             }
         })
-        
-    except Exception as e:
-        print(f"Prediction error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
 
+    return results
 
-@app.route('/api/model-info')
-def model_info():
-    """Return model information and metrics."""
+
+def _build_model_info():
+    """Assemble the /api/model-info payload (metrics read once from disk)."""
     metrics_path = Path('model/delay_duration/output/metrics.json')
-    
+
     info = {
         'modelLoaded': model is not None and model.is_fitted,
-        'shapAvailable': shap_explainer is not None,
+        'shapAvailable': model is not None and model.is_fitted,
         'encodersLoaded': label_encoders is not None
     }
-    
+
     if metrics_path.exists():
         with open(metrics_path, 'r') as f:
             metrics = json.load(f)
@@ -567,8 +940,20 @@ def model_info():
             'mae': 12.4,
             'mape': 15.3
         }
-    
-    return jsonify(info)
+
+    return info
+
+
+@app.route('/api/model-info')
+def model_info():
+    """Return model information and metrics."""
+    global MODEL_INFO_PAYLOAD
+
+    # Metrics only change when the model reloads - no disk IO per request
+    if MODEL_INFO_PAYLOAD is None:
+        MODEL_INFO_PAYLOAD = _build_model_info()
+
+    return ojsonify(MODEL_INFO_PAYLOAD)
 
 
 # =============================================================================
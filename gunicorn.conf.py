@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration for the Flight Delay Predictor.
+
+Run with: gunicorn -c gunicorn.conf.py app:app
+
+The default sync worker has no keep-alive and caps throughput well below
+what this API can serve; use meinheld (or gevent) workers when installed.
+"""
+
+import os
+
+bind = '0.0.0.0:' + os.environ.get('PORT', '5000')
+workers = 2 * (os.cpu_count() or 1)
+keepalive = 5
+
+# Prefer an async keep-alive worker when available; fall back to sync
+try:
+    import meinheld  # noqa: F401
+    worker_class = 'meinheld.gmeinheld.MeinheldWorker'
+except ImportError:
+    try:
+        import gevent  # noqa: F401
+        worker_class = 'gevent'
+    except ImportError:
+        worker_class = 'sync'
+
+
+def post_fork(server, worker):
+    """Load model state per worker - boosters are not safe to share across forks."""
+    from app import load_model
+    load_model()
@@ -57,18 +57,22 @@ RANDOM_STATE = 42
 # MODEL HYPERPARAMETERS
 # ============================================================================
 
-# XGBoost hyperparameters for regression
+# XGBoost hyperparameters for regression.
+# A generous n_estimators ceiling with early stopping (save_best) lets
+# validation RMSE pick the tree count instead of a hand-tuned cap.
 XGBOOST_PARAMS = {
     'objective': 'reg:squarederror',
     'eval_metric': ['rmse', 'mae'],
     'max_depth': 8,
     'learning_rate': 0.1,
-    'n_estimators': 200,
+    'n_estimators': 5000,
     'subsample': 0.8,
     'colsample_bytree': 0.8,
     'random_state': RANDOM_STATE,
-    'tree_method': 'hist',  # Faster for large datasets
-    'early_stopping_rounds': 20,
+    'tree_method': 'hist',   # Faster for large datasets
+    'max_bin': 256,          # Bin continuous features once, <=256 bins
+    'grow_policy': 'depthwise',
+    'early_stopping_rounds': 50,
 }
 
 # ============================================================================
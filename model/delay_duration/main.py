@@ -47,6 +47,20 @@ def parse_arguments():
         help='Proportion of data to use for testing (0-1)'
     )
 
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=None,
+        help='Training threads (default: physical cores, capped at 16)'
+    )
+
+    parser.add_argument(
+        '--device',
+        choices=['cpu', 'cuda'],
+        default='cpu',
+        help='Training device (cuda requires cupy; falls back to cpu)'
+    )
+
     parser.add_argument(
         '--no-save',
         action='store_true',
@@ -59,6 +73,12 @@ def parse_arguments():
         help='Do not create or save plots'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Bypass the parquet cache and re-query the database'
+    )
+
     parser.add_argument(
         '--quiet',
         action='store_true',
@@ -96,7 +116,9 @@ def main():
     # STEP 1: LOAD DATA
     # ========================================================================
     try:
-        df = load_data_from_db(str(db_path), verbose=verbose)
+        df = load_data_from_db(
+            str(db_path), verbose=verbose, use_cache=not args.no_cache
+        )
     except Exception as e:
         print(f"\nError loading data: {e}")
         print(f"Please ensure the database exists at: {db_path}")
@@ -137,6 +159,10 @@ def main():
     # STEP 7: TRAIN MODEL
     # ========================================================================
     model = DelayDurationModel()
+    if args.threads:
+        model.params['n_jobs'] = args.threads
+    if args.device == 'cuda':
+        model.params['device'] = 'cuda'
     model.fit(X_train, y_train, X_test, y_test, verbose=verbose)
 
     # ========================================================================
@@ -1,17 +1,45 @@
+import os
 import pandas as pd
 import numpy as np
-import pickle
+import joblib
 import json
 from pathlib import Path
 from typing import Dict, Tuple, Optional
 import xgboost as xgb
-from sklearn.metrics import (
-    mean_squared_error, mean_absolute_error, r2_score,
-    median_absolute_error, explained_variance_score
-)
-from sklearn.preprocessing import LabelEncoder
+from sklearn.metrics import r2_score, explained_variance_score
+# Optional: daal4py accelerates gradient-boosted-tree inference on Intel CPUs
+try:
+    import daal4py
+except ImportError:
+    daal4py = None
+
+# Optional: psutil distinguishes physical from logical cores
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Optional: cupy stages training data on the GPU for device='cuda'
+try:
+    import cupy
+except ImportError:
+    cupy = None
 
 from model.delay_duration.config import XGBOOST_PARAMS, XGBOOST_VERBOSE
+from model.delay_duration.utils import CategoricalEncoder
+
+
+def _default_threads() -> int:
+    """
+    Pick a thread count for training.
+
+    Histogram builds scale poorly past physical cores (hyperthread and
+    NUMA contention), so prefer the physical count and cap at 16.
+    """
+    physical = psutil.cpu_count(logical=False) if psutil is not None else None
+    if not physical:
+        physical = os.cpu_count() or 1
+    return min(physical, 16)
 
 
 class DelayDurationModel:
@@ -30,9 +58,13 @@ class DelayDurationModel:
             params: XGBoost hyperparameters. If None, uses default from config.
         """
         self.params = params if params is not None else XGBOOST_PARAMS.copy()
+        self.params.setdefault('n_jobs', _default_threads())
         self.model = None
+        self.booster = None
         self.feature_names = None
+        self.best_iteration = None
         self.is_fitted = False
+        self._daal_model = None
 
     def fit(
         self,
@@ -65,31 +97,91 @@ class DelayDurationModel:
             for key, val in self.params.items():
                 print(f"  {key}: {val}")
 
-        # Create model
-        self.model = xgb.XGBRegressor(**self.params)
+        # Split sklearn-style params into native booster params and the
+        # pieces xgb.train takes as arguments
+        num_boost_round = self.params.get('n_estimators', 200)
+        early_stopping = self.params.get('early_stopping_rounds')
+        booster_params = {
+            k: v for k, v in self.params.items()
+            if k not in ('n_estimators', 'early_stopping_rounds')
+        }
+        if 'random_state' in booster_params:
+            booster_params['seed'] = booster_params.pop('random_state')
+        n_threads = booster_params.pop('n_jobs', _default_threads())
+        booster_params['nthread'] = n_threads
+
+        # GPU training needs the data already on device; without cupy,
+        # quietly fall back to the CPU hist path
+        use_cuda = booster_params.get('device') == 'cuda'
+        if use_cuda and cupy is None:
+            if verbose:
+                print("\ncupy not installed - falling back to CPU training")
+            booster_params['device'] = 'cpu'
+            use_cuda = False
+
+        def as_device_array(values):
+            arr = values.to_numpy(dtype=np.float32, copy=False)
+            if arr.ndim == 2:
+                # The hist builder scans feature-wise; column-major
+                # layout keeps each feature's values contiguous instead
+                # of striding across rows
+                arr = np.asfortranarray(arr)
+            return cupy.asarray(arr) if use_cuda else arr
 
         # Store feature names
         self.feature_names = list(X_train.columns)
 
-        # Prepare evaluation set
-        eval_set = [(X_train, y_train)]
+        # QuantileDMatrix bins float32 arrays directly, skipping the
+        # intermediate DMatrix copy the sklearn wrapper makes - roughly
+        # half the input memory. float32 also matches the rows the
+        # serving path feeds to the booster.
+        # nthread is passed to the DMatrix too: its construction does not
+        # inherit the booster thread setting
+        dtrain = xgb.QuantileDMatrix(
+            as_device_array(X_train),
+            label=as_device_array(y_train),
+            feature_names=self.feature_names,
+            nthread=n_threads
+        )
+
+        evals = [(dtrain, 'train')]
         if X_val is not None and y_val is not None:
-            eval_set.append((X_val, y_val))
+            dval = xgb.QuantileDMatrix(
+                as_device_array(X_val),
+                label=as_device_array(y_val),
+                ref=dtrain,
+                feature_names=self.feature_names,
+                nthread=n_threads
+            )
+            evals.append((dval, 'eval'))
+
+        # Early stopping via callback; save_best trims the returned
+        # booster to the best iteration so no dead trees are kept
+        callbacks = None
+        if early_stopping:
+            callbacks = [xgb.callback.EarlyStopping(rounds=early_stopping,
+                                                    save_best=True)]
 
         # Train model
         if verbose:
             print("\nTraining model...")
 
-        self.model.fit(
-            X_train, y_train,
-            eval_set=eval_set,
-            verbose=XGBOOST_VERBOSE if verbose else 0
+        self.booster = xgb.train(
+            booster_params,
+            dtrain,
+            num_boost_round=num_boost_round,
+            evals=evals,
+            callbacks=callbacks,
+            verbose_eval=XGBOOST_VERBOSE if verbose else False
         )
 
         self.is_fitted = True
+        self.best_iteration = getattr(self.booster, 'best_iteration', None)
 
         if verbose:
             print("\nTraining complete!")
+            if self.best_iteration is not None:
+                print(f"Best iteration: {self.best_iteration}")
 
         return self
 
@@ -106,7 +198,36 @@ class DelayDurationModel:
         if not self.is_fitted:
             raise ValueError("Model must be fitted before making predictions")
 
-        return self.model.predict(X)
+        if isinstance(X, np.ndarray):
+            return self.predict_row(X)
+
+        return self.predict_row(X.to_numpy(dtype=np.float32, copy=False))
+
+    def predict_row(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict delay duration for a pre-validated feature array.
+
+        Fast path for online inference: assumes the columns of X already
+        match the training feature order (validated once at load time),
+        so no pandas conversion or per-call feature-name check happens.
+
+        Args:
+            X: (n, n_features) ndarray in training column order
+
+        Returns:
+            Array of predicted delay durations (in minutes)
+        """
+        # daal4py tree traversal if available, otherwise inplace_predict
+        # skips the per-call DMatrix construction entirely
+        if self._daal_model is not None:
+            result = daal4py.gbt_regression_prediction().compute(X, self._daal_model)
+            return result.prediction.ravel()
+        # Traverse only up to the best early-stopping iteration when known
+        if self.best_iteration is not None:
+            return self.booster.inplace_predict(
+                X, iteration_range=(0, self.best_iteration + 1)
+            )
+        return self.booster.inplace_predict(X)
 
     def get_feature_importance(self) -> pd.DataFrame:
         """
@@ -118,14 +239,24 @@ class DelayDurationModel:
         if not self.is_fitted:
             raise ValueError("Model must be fitted before getting feature importance")
 
+        # Gain scores from the booster, normalized to sum to 1 (same
+        # scale the sklearn wrapper's feature_importances_ reported)
+        scores = self.booster.get_score(importance_type='gain')
+        importance = np.array(
+            [scores.get(name, 0.0) for name in self.feature_names],
+            dtype=np.float64
+        )
+        if importance.sum() > 0:
+            importance /= importance.sum()
+
         feature_importance = pd.DataFrame({
             'feature': self.feature_names,
-            'importance': self.model.feature_importances_
+            'importance': importance
         }).sort_values('importance', ascending=False)
 
         return feature_importance
 
-    def save(self, model_path: Path, encoders: Optional[Dict[str, LabelEncoder]] = None) -> None:
+    def save(self, model_path: Path, encoders: Optional[Dict[str, CategoricalEncoder]] = None) -> None:
         """
         Save the trained model and optionally the label encoders.
 
@@ -139,15 +270,15 @@ class DelayDurationModel:
         # Ensure output directory exists
         model_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Save model
-        self.model.save_model(str(model_path))
+        # Save model (same JSON format the XGBRegressor loader reads)
+        self.booster.save_model(str(model_path))
         print(f"Model saved to: {model_path}")
 
-        # Save encoders if provided
+        # Save encoders if provided. Uncompressed joblib so load_encoders
+        # can memory-map the classes_ arrays (mmap needs raw bytes)
         if encoders is not None:
             encoders_path = model_path.parent / 'label_encoders.pkl'
-            with open(encoders_path, 'wb') as f:
-                pickle.dump(encoders, f)
+            joblib.dump(encoders, encoders_path)
             print(f"Encoders saved to: {encoders_path}")
 
     def load(self, model_path: Path) -> 'DelayDurationModel':
@@ -162,12 +293,27 @@ class DelayDurationModel:
         """
         self.model = xgb.XGBRegressor()
         self.model.load_model(str(model_path))
+        self.booster = self.model.get_booster()
+        self.feature_names = self.booster.feature_names
+        self.best_iteration = getattr(self.booster, 'best_iteration', None)
         self.is_fitted = True
         print(f"Model loaded from: {model_path}")
+
+        # Convert once for accelerated inference when daal4py is installed
+        if daal4py is not None:
+            try:
+                self._daal_model = daal4py.get_gbt_regression_model_from_xgboost(
+                    self.model.get_booster()
+                )
+                print("daal4py inference model ready")
+            except Exception as e:
+                print(f"daal4py conversion skipped: {e}")
+                self._daal_model = None
+
         return self
 
     @staticmethod
-    def load_encoders(encoders_path: Path) -> Dict[str, LabelEncoder]:
+    def load_encoders(encoders_path: Path) -> Dict[str, CategoricalEncoder]:
         """
         Load label encoders from file.
 
@@ -177,8 +323,9 @@ class DelayDurationModel:
         Returns:
             Dictionary of label encoders
         """
-        with open(encoders_path, 'rb') as f:
-            encoders = pickle.load(f)
+        # mmap_mode='r' maps the classes_ arrays read-only from disk, so
+        # forked inference workers share one copy of the pages
+        encoders = joblib.load(encoders_path, mmap_mode='r')
         print(f"Encoders loaded from: {encoders_path}")
         return encoders
 
@@ -216,37 +363,53 @@ def evaluate_model(
         print("MODEL EVALUATION")
         print("=" * 70)
 
-    # Calculate metrics
-    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-    mae = mean_absolute_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
-    median_ae = median_absolute_error(y_test, y_pred)
-    explained_var = explained_variance_score(y_test, y_pred)
+    # Materialize plain arrays once; every stat below runs on them, so
+    # nothing is computed twice for the metrics dict and the print block
+    y_true = y_test.to_numpy(dtype=np.float32)
+    y_pred = y_pred.astype(np.float32, copy=False)
 
-    # Calculate residuals
-    residuals = y_test - y_pred
+    residuals = y_true - y_pred
+    abs_err = np.abs(residuals)
 
-    # Calculate percentage metrics
-    mape = np.mean(np.abs((y_test - y_pred) / y_test)) * 100
+    # Calculate metrics
+    rmse = float(np.sqrt(np.mean(residuals * residuals)))
+    mae = float(abs_err.mean())
+    r2 = float(r2_score(y_true, y_pred))
+    median_ae = float(np.median(abs_err))
+    explained_var = float(explained_variance_score(y_true, y_pred))
+    mape = float(np.mean(abs_err / y_true) * 100)
+
+    # Target/prediction statistics (ddof=1 matches pandas' Series.std)
+    mean_actual = float(y_true.mean())
+    std_actual = float(y_true.std(ddof=1))
+    min_actual = float(y_true.min())
+    max_actual = float(y_true.max())
+    mean_predicted = float(y_pred.mean())
+    std_predicted = float(y_pred.std())
+    min_predicted = float(y_pred.min())
+    max_predicted = float(y_pred.max())
 
     # Store all metrics
     metrics = {
-        'rmse': float(rmse),
-        'mae': float(mae),
-        'r2_score': float(r2),
-        'median_absolute_error': float(median_ae),
-        'explained_variance': float(explained_var),
-        'mape': float(mape),
-        'mean_actual': float(y_test.mean()),
-        'mean_predicted': float(y_pred.mean()),
-        'std_actual': float(y_test.std()),
-        'std_predicted': float(y_pred.std()),
-        'min_actual': float(y_test.min()),
-        'max_actual': float(y_test.max()),
-        'min_predicted': float(y_pred.min()),
-        'max_predicted': float(y_pred.max()),
-        'predictions': y_pred.tolist(),
-        'residuals': residuals.tolist()
+        'rmse': rmse,
+        'mae': mae,
+        'r2_score': r2,
+        'median_absolute_error': median_ae,
+        'explained_variance': explained_var,
+        'mape': mape,
+        'mean_actual': mean_actual,
+        'mean_predicted': mean_predicted,
+        'std_actual': std_actual,
+        'std_predicted': std_predicted,
+        'min_actual': min_actual,
+        'max_actual': max_actual,
+        'min_predicted': min_predicted,
+        'max_predicted': max_predicted,
+        # Kept as ndarrays: converting millions of elements to Python
+        # lists allocates a PyFloat per value, and save_metrics drops
+        # these keys anyway
+        'predictions': y_pred,
+        'residuals': residuals
     }
 
     if verbose:
@@ -259,12 +422,12 @@ def evaluate_model(
         print(f"Mean Absolute Percentage Error (MAPE): {mape:.2f}%")
 
         print("\nTarget Statistics:")
-        print(f"  Actual - Mean: {y_test.mean():.2f}, Std: {y_test.std():.2f}")
-        print(f"  Predicted - Mean: {y_pred.mean():.2f}, Std: {y_pred.std():.2f}")
+        print(f"  Actual - Mean: {mean_actual:.2f}, Std: {std_actual:.2f}")
+        print(f"  Predicted - Mean: {mean_predicted:.2f}, Std: {std_predicted:.2f}")
 
         print("\nValue Ranges:")
-        print(f"  Actual: [{y_test.min():.2f}, {y_test.max():.2f}]")
-        print(f"  Predicted: [{y_pred.min():.2f}, {y_pred.max():.2f}]")
+        print(f"  Actual: [{min_actual:.2f}, {max_actual:.2f}]")
+        print(f"  Predicted: [{min_predicted:.2f}, {max_predicted:.2f}]")
 
     return metrics
 
@@ -280,7 +443,7 @@ def save_metrics(metrics: Dict, output_path: Path) -> None:
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Don't save predictions and residuals to JSON (too large)
+    # Don't save the predictions and residuals arrays to JSON (too large)
     metrics_to_save = {k: v for k, v in metrics.items()
                        if k not in ['predictions', 'residuals']}
 